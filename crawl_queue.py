@@ -0,0 +1,250 @@
+""" work queue of GitHub URLs to crawl, shared by worker processes through
+an SQLite database. Workers claim batches of URLs under time-limited leases
+and write results back. A lease that expires before its results are written,
+for example because the worker died, is handed to the next worker that asks,
+and workers keep polling until no leases are outstanding.
+The database uses SQLite's rollback journal rather than WAL, whose shared
+memory index only works for processes on one host, so workers on other
+machines can share the queue if the database is on a network file system
+with working byte-range locks. The database persists between runs: call
+reset_queue, or delete it, to crawl the same URLs again. """
+import os
+import json
+import time
+import sqlite3
+from github_util import repo_data
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    pos INTEGER,
+    state TEXT DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER DEFAULT 0,
+    stars INTEGER,
+    license TEXT,
+    topics TEXT
+);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state, lease_expires);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    nrepos INTEGER DEFAULT 0,
+    first_claim REAL,
+    last_done REAL
+);
+"""
+
+def connect(db_path, timeout=60.0):
+    """ return a connection to the queue database, creating its tables if needed """
+    con = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+    con.execute("PRAGMA journal_mode=DELETE")  # WAL needs all processes on one host
+    con.executescript(SCHEMA)
+    return con
+
+def add_urls(db_path, urls):
+    """
+    Add URLs to the queue. URLs already in the queue keep their state and results,
+    so URLs completed by an earlier crawl are not crawled again until reset_queue
+    is called.
+
+    Args:
+        db_path (str): Path to the queue database
+        urls (iterable of str): Repository URLs, in the order results should be written
+
+    Returns:
+        int: Number of URLs added
+    """
+    con = connect(db_path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        start = con.execute("SELECT COALESCE(MAX(pos), -1) + 1 FROM urls").fetchone()[0]
+        before = con.total_changes
+        con.executemany("INSERT OR IGNORE INTO urls (url, pos) VALUES (?, ?)",
+                        ((url, start + i) for i, url in enumerate(urls)))
+        con.execute("COMMIT")
+        return con.total_changes - before
+    finally:
+        con.close()
+
+def reset_queue(db_path):
+    """
+    Set every URL in the queue back to pending, discarding earlier results and
+    worker statistics, to start a fresh crawl of the same URLs.
+
+    Args:
+        db_path (str): Path to the queue database
+
+    Returns:
+        int: Number of URLs reset
+    """
+    con = connect(db_path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        nreset = con.execute("UPDATE urls SET state = 'pending', worker = NULL,"
+                             " lease_expires = NULL, attempts = 0, stars = NULL,"
+                             " license = NULL, topics = NULL").rowcount
+        con.execute("DELETE FROM workers")
+        con.execute("COMMIT")
+        return nreset
+    finally:
+        con.close()
+
+def claim_batch(con, worker, batch_size, lease_seconds):
+    """
+    Lease up to batch_size pending URLs, or URLs whose lease has expired, to a worker.
+
+    Args:
+        con (sqlite3.Connection): Connection returned by connect
+        worker (str): Name of the worker
+        batch_size (int): Maximum number of URLs to claim
+        lease_seconds (float): Time the worker has to write results for the batch
+
+    Returns:
+        list of str: Claimed URLs, empty if no work is left
+    """
+    now = time.time()
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        urls = [row[0] for row in con.execute(
+            "SELECT url FROM urls WHERE state = 'pending'"
+            " OR (state = 'leased' AND lease_expires < ?) ORDER BY pos LIMIT ?",
+            (now, batch_size))]
+        con.executemany("UPDATE urls SET state = 'leased', worker = ?, lease_expires = ?,"
+                        " attempts = attempts + 1 WHERE url = ?",
+                        ((worker, now + lease_seconds, url) for url in urls))
+        if urls:
+            con.execute("INSERT OR IGNORE INTO workers (worker, first_claim) VALUES (?, ?)",
+                        (worker, now))
+        con.execute("COMMIT")
+    except sqlite3.Error:
+        con.execute("ROLLBACK")
+        raise
+    return urls
+
+def complete_batch(con, worker, results):
+    """
+    Record the results of a batch. Results for URLs that another worker has
+    already completed are ignored.
+
+    Args:
+        con (sqlite3.Connection): Connection returned by connect
+        worker (str): Name of the worker
+        results (dict): URLs mapped to dicts with 'stars', 'license', 'topics'
+
+    Returns:
+        int: Number of URLs recorded
+    """
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        before = con.total_changes
+        con.executemany("UPDATE urls SET state = 'done', worker = ?, lease_expires = NULL,"
+                        " stars = ?, license = ?, topics = ? WHERE url = ? AND state != 'done'",
+                        ((worker, data.get('stars', -1), data.get('license'),
+                          json.dumps(data.get('topics', [])), url)
+                         for url, data in results.items()))
+        ndone = con.total_changes - before
+        con.execute("UPDATE workers SET nrepos = nrepos + ?, last_done = ? WHERE worker = ?",
+                    (ndone, time.time(), worker))
+        con.execute("COMMIT")
+    except sqlite3.Error:
+        con.execute("ROLLBACK")
+        raise
+    return ndone
+
+def run_worker(db_path, worker=None, batch_size=20, lease_seconds=300.0,
+    fetch=repo_data, max_wait=10.0):
+    """
+    Claim and crawl batches of URLs until every URL is done. While nothing is
+    pending but other workers hold leases, wait until the earliest lease
+    expires, checking at least every max_wait seconds, so that the batches of
+    a worker that died are still crawled.
+
+    Args:
+        db_path (str): Path to the queue database
+        worker (str, optional): Name of the worker. Defaults to host name and process id.
+        batch_size (int): Number of URLs claimed at a time
+        lease_seconds (float): Lease on each batch; should comfortably exceed
+                               the time to fetch batch_size URLs
+        fetch (callable): Function mapping a URL to a dict with 'stars', 'license', 'topics'
+        max_wait (float): Longest time in seconds between checks of outstanding leases
+
+    Returns:
+        int: Number of URLs this worker completed
+    """
+    if worker is None:
+        worker = f"{os.uname().nodename if hasattr(os, 'uname') else 'host'}-{os.getpid()}"
+    con = connect(db_path)
+    ndone = 0
+    try:
+        while True:
+            urls = claim_batch(con, worker, batch_size, lease_seconds)
+            if not urls:
+                earliest = con.execute("SELECT MIN(lease_expires) FROM urls"
+                                       " WHERE state = 'leased'").fetchone()[0]
+                if earliest is None:
+                    break
+                time.sleep(min(max(earliest - time.time(), 0.0) + 0.01, max_wait))
+                continue
+            ndone += complete_batch(con, worker, {url: fetch(url) for url in urls})
+    finally:
+        con.close()
+    return ndone
+
+def queue_status(db_path):
+    """ return a dict mapping each state ('pending', 'leased', 'done') to its number of URLs """
+    con = connect(db_path)
+    try:
+        status = {'pending': 0, 'leased': 0, 'done': 0}
+        status.update(con.execute("SELECT state, COUNT(*) FROM urls GROUP BY state"))
+        return status
+    finally:
+        con.close()
+
+def worker_throughput(db_path):
+    """
+    Report the throughput of each worker.
+
+    Args:
+        db_path (str): Path to the queue database
+
+    Returns:
+        list of tuple: (worker, repos completed, seconds from first claim to
+                       last completion, repos per second), sorted by worker
+    """
+    con = connect(db_path)
+    try:
+        rows = con.execute("SELECT worker, nrepos, first_claim, last_done"
+                           " FROM workers ORDER BY worker").fetchall()
+    finally:
+        con.close()
+    stats = []
+    for worker, nrepos, first_claim, last_done in rows:
+        seconds = (last_done - first_claim) if last_done else 0.0
+        stats.append((worker, nrepos, seconds, nrepos / seconds if seconds > 0 else 0.0))
+    return stats
+
+def write_repo_data(db_path, outfile):
+    """
+    Write the completed results, in queue order, to a file in the format read
+    by github_util.read_repo_data.
+
+    Args:
+        db_path (str): Path to the queue database
+        outfile (str): Path to the output file
+
+    Returns:
+        int: Number of repos written
+    """
+    con = connect(db_path)
+    nrepos = 0
+    try:
+        with open(outfile, 'w', encoding='utf-8') as f:
+            for url, stars, license, topics in con.execute(
+                    "SELECT url, stars, license, topics FROM urls"
+                    " WHERE state = 'done' ORDER BY pos"):
+                f.write(f"{url}\nstars {stars}\nlicense {license}\ntopics {json.loads(topics)}\n\n")
+                nrepos += 1
+    finally:
+        con.close()
+    return nrepos
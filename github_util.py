@@ -4,6 +4,7 @@ import requests
 import os
 import time
 import ast
+import json
 from datetime import datetime
 
 # GitHub API token handling
@@ -18,6 +19,89 @@ def load_github_token():
 GITHUB_TOKEN = load_github_token()
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
+# Memo of renamed and deleted repositories, so later crawls skip the redirect hop
+# or the request entirely
+MEMO_FILE = "repo_memo.json"
+REDIRECT_TTL = 90 * 24 * 3600  # seconds a recorded redirect target is trusted
+MISSING_TTL = 7 * 24 * 3600    # seconds a repo that returned 404 is skipped
+
+def load_repo_memo(file_path=MEMO_FILE):
+    """
+    Load the memo of redirected and missing repositories.
+
+    Args:
+        file_path (str): Path to the memo file
+
+    Returns:
+        dict: Repo URLs mapped to dicts with 'status' ('redirect' or 'missing'),
+              'target' (canonical URL for redirects, else None) and 'time' (epoch
+              seconds when recorded). Empty if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_repo_memo(memo, file_path=MEMO_FILE):
+    """ Write the memo of redirected and missing repositories to a file. """
+    tmp_file = file_path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(memo, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, file_path)
+
+def memo_record(memo, repo_url, status, target=None):
+    """ Record that repo_url redirected to target, or that it was not found. """
+    memo[repo_url.rstrip('/')] = {'status': status, 'target': target, 'time': time.time()}
+
+def memo_lookup(memo, repo_url):
+    """
+    Resolve a repo URL through the memo, following chains of redirects.
+
+    Args:
+        memo (dict): Memo returned by load_repo_memo
+        repo_url (str): Repository URL
+
+    Returns:
+        tuple: (url, missing) where url is the canonical URL to fetch and missing
+               is True if the repo returned 404 within the last MISSING_TTL seconds
+    """
+    now = time.time()
+    url = repo_url.rstrip('/')
+    for _ in range(10):  # guard against redirect cycles
+        entry = memo.get(url)
+        if entry is None:
+            break
+        if entry['status'] == 'missing':
+            return url, now - entry['time'] < MISSING_TTL
+        if now - entry['time'] >= REDIRECT_TTL:
+            break
+        url = entry['target']
+    return url, False
+
+def memo_report(memo, urls_file="github_fortran_urls.txt"):
+    """
+    List the URLs of a file that have moved or are missing according to the memo.
+
+    Args:
+        memo (dict): Memo returned by load_repo_memo
+        urls_file (str): File with one repository URL per line
+
+    Returns:
+        list: Tuples (url, status, canonical URL or None), in file order
+    """
+    report = []
+    with open(urls_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url.rstrip('/') not in memo:
+                continue
+            target, missing = memo_lookup(memo, url)
+            if missing:
+                report.append((url, 'missing', None))
+            elif target != url.rstrip('/'):
+                report.append((url, 'redirect', target))
+    return report
+
 def github_stars(repo_url, method="page"):
     if method == "page":
         return github_stars_from_page(repo_url)
@@ -98,13 +182,16 @@ def github_stars_from_page(repo_url, sleep_time=0.1):
     finally:
         time.sleep(sleep_time)  # Add a delay after each request
 
-def repo_data(repo_url, sleep_time=0.1):
+def repo_data(repo_url, sleep_time=0.1, memo=None):
     """
     Fetch information about a GitHub repository by scraping its webpage.
     
     Args:
         repo_url (str): The URL of the GitHub repository (e.g., 'https://github.com/Beliavsky/R_and_Fortran')
         sleep_time (float): Time in seconds to sleep after the request (default: 0.1)
+        memo (dict, optional): Memo from load_repo_memo. If given, a renamed repo is
+                               fetched from its recorded canonical URL, a repo that recently
+                               returned 404 is not fetched, and new redirects and 404s are recorded.
     
     Returns:
         dict: Dictionary containing 'stars' (int), 'license' (str or None), and 'topics' (list of str),
@@ -113,6 +200,12 @@ def repo_data(repo_url, sleep_time=0.1):
     # Default return value in case of failure
     default_data = {'stars': -1, 'license': None, 'topics': []}
     
+    fetch_url = repo_url
+    if memo is not None:
+        fetch_url, missing = memo_lookup(memo, repo_url)
+        if missing:
+            return default_data
+    
     try:
         # Set a user-agent to mimic a browser and avoid being blocked
         headers = {
@@ -120,7 +213,14 @@ def repo_data(repo_url, sleep_time=0.1):
         }
         
         # Fetch the webpage
-        response = requests.get(repo_url, headers=headers, timeout=10)
+        response = requests.get(fetch_url, headers=headers, timeout=10)
+        if memo is not None:
+            if response.status_code in (404, 410):
+                memo_record(memo, repo_url, 'missing')
+            elif response.history and response.url.rstrip('/') != fetch_url.rstrip('/'):
+                memo_record(memo, repo_url, 'redirect', response.url.rstrip('/'))
+            elif response.ok and fetch_url.rstrip('/') == repo_url.rstrip('/'):
+                memo.pop(repo_url.rstrip('/'), None)  # found again, forget any old 404
         response.raise_for_status()  # Raise an exception for bad status codes
         
         # Parse the HTML
@@ -205,13 +305,13 @@ def read_repo_data(file_path):
                     current_data = {}
                 current_url = line
             elif line.startswith('stars '):
-                current_data['stars'] = int(line.replace('stars ', ''))
+                current_data['stars'] = int(line[len('stars '):])
             elif line.startswith('license '):
-                license_text = line.replace('license ', '')
+                license_text = line[len('license '):]  # keeps e.g. 'Unlicense license' intact
                 current_data['license'] = license_text if license_text != 'None' else None
             elif line.startswith('topics '):
                 # Parse the topics list string into an actual list
-                topics_str = line.replace('topics ', '')
+                topics_str = line[len('topics '):]
                 current_data['topics'] = ast.literal_eval(topics_str)
         
         # Save the last entry if it exists
@@ -294,7 +394,7 @@ def repo_creation_date_api(owner, repo, token=None):
     finally:
         time.sleep(1)  # Be polite to GitHub servers
 
-def repo_info(owner, repo, token=None):
+def repo_info(owner, repo, token=None, memo=None):
     """
     Fetch all available fields for a GitHub repository using the GitHub API.
     
@@ -302,11 +402,19 @@ def repo_info(owner, repo, token=None):
         owner (str): Repository owner (e.g., 'ef1j')
         repo (str): Repository name (e.g., 'Art1')
         token (str, optional): GitHub personal access token for higher rate limits
+        memo (dict, optional): Memo from load_repo_memo, used as in repo_data
     
     Returns:
         dict: Dictionary containing all fields from the API response,
               or an empty dict if the fetch fails
     """
+    repo_url = f"https://github.com/{owner}/{repo}"
+    if memo is not None:
+        canonical_url, missing = memo_lookup(memo, repo_url)
+        if missing:
+            print(f"Repository not found (memo): {owner}/{repo}")
+            return {}
+        owner, repo = canonical_url.split('/')[-2:]
     url = f"https://api.github.com/repos/{owner}/{repo}"
     headers = {
         "Accept": "application/vnd.github.v3+json",
@@ -321,11 +429,16 @@ def repo_info(owner, repo, token=None):
             return {}
         elif response.status_code == 404:
             print(f"Repository not found: {owner}/{repo}")
+            if memo is not None:
+                memo_record(memo, repo_url, 'missing')
             return {}
         response.raise_for_status()
         
         # Return the full JSON response as a dictionary
         data = response.json()
+        full_name = data.get("full_name")
+        if memo is not None and full_name and full_name.lower() != f"{owner}/{repo}".lower():
+            memo_record(memo, repo_url, 'redirect', f"https://github.com/{full_name}")
         print(f"Successfully fetched data for {owner}/{repo}")
         return data
     
@@ -0,0 +1,170 @@
+""" chain line transforms like those of util.py (truncate_lines_at_sentinel,
+expand_ranges, process_csv_to_lines, replace_leading_spaces, modify_lines)
+over a single chunked read of a file, optionally splitting a large file
+across worker processes while keeping the order of lines.
+
+A stage is a function taking a list of lines, without newlines, and returning
+a list of lines. The functions below return picklable stages, so that they
+can be sent to worker processes on all platforms. Example:
+    run_pipeline("in.txt", "out.txt", [csv_to_lines_stage(), expand_ranges_stage()])
+"""
+import os
+import re
+import shutil
+import unicodedata
+from functools import partial
+from multiprocessing import Pool
+from util import replacements_pattern
+
+RANGE_PATTERN = re.compile(r"(\d+)\u2013(\d+)")  # range with en dash
+
+def _truncate(sentinel, lines):
+    return [line.split(sentinel)[0].strip() for line in lines]
+
+def truncate_stage(sentinel):
+    """ stage truncating each line before the first occurrence of sentinel,
+    as in util.truncate_lines_at_sentinel """
+    return partial(_truncate, sentinel)
+
+def _expand_ranges(lines):
+    result = []
+    for line in lines:
+        line = line.strip()
+        if not line.isascii():
+            line = unicodedata.normalize('NFC', line)  # identity on ASCII
+        match = RANGE_PATTERN.search(line) if '\u2013' in line else None
+        if match:
+            start, end = match.groups()
+            width = len(start)
+            result.append(', '.join(f"{num:0{width}d}"
+                                    for num in range(int(start), int(end) + 1)))
+        else:
+            result.append(line)
+    return result
+
+def expand_ranges_stage():
+    """ stage replacing lines with an en dash range by a comma-separated list
+    of integers, as in util.expand_ranges """
+    return _expand_ranges
+
+def _csv_to_lines(lines):
+    return [value.strip() for line in lines for value in line.strip().split(',')]
+
+def csv_to_lines_stage():
+    """ stage writing each comma-separated value on its own line, as in
+    util.process_csv_to_lines """
+    return _csv_to_lines
+
+def _replace_leading_spaces(nspaces, rep, lines):
+    result = []
+    for line in lines:
+        leading_spaces = len(line) - len(line.lstrip())
+        if 1 <= leading_spaces < nspaces:
+            line = rep + line[leading_spaces:]
+        elif leading_spaces >= nspaces:
+            line = rep + line[nspaces:]
+        result.append(line)
+    return result
+
+def replace_leading_spaces_stage(nspaces=1, rep=""):
+    """ stage replacing up to nspaces leading spaces of each line by rep, as in
+    util.replace_leading_spaces, except that blank and whitespace-only lines
+    are kept. util.replace_leading_spaces counts their newline as leading
+    whitespace and so merges them into the next line; the stage intentionally
+    does not reproduce that. """
+    return partial(_replace_leading_spaces, nspaces, rep)
+
+def _modify_lines(matcher, append_char, ignore_spaces, lines):
+    if matcher is None:
+        return [line + append_char for line in lines]
+    if ignore_spaces:
+        return [line + append_char if matcher.match(line.lstrip()) else line for line in lines]
+    return [line + append_char if matcher.match(line) else line for line in lines]
+
+def modify_lines_stage(start_strings, append_char, ignore_case=False, ignore_spaces=False):
+    """
+    Stage appending append_char to lines that start with any string from
+    start_strings, as in util.modify_lines. The start strings are compiled
+    once into a single trie-shaped regular expression, so the cost of matching
+    a line does not grow with the number of start strings.
+    """
+    if '' in start_strings:
+        return partial(_modify_lines, None, append_char, ignore_spaces)
+    pattern = replacements_pattern(dict.fromkeys(start_strings))
+    regex = pattern.pattern if pattern is not None else r'(?!)'
+    return partial(_modify_lines, re.compile(regex, re.IGNORECASE if ignore_case else 0),
+                   append_char, ignore_spaces)
+
+def _line_ranges(input_file, nparts):
+    """ split a file into at most nparts byte ranges that start at the beginning of a line """
+    size = os.path.getsize(input_file)
+    starts = [0]
+    with open(input_file, 'rb') as f:
+        for i in range(1, nparts):
+            f.seek(size * i // nparts)
+            if f.tell() > starts[-1]:
+                f.readline()
+                if starts[-1] < f.tell() < size:
+                    starts.append(f.tell())
+    return list(zip(starts, starts[1:] + [size]))
+
+def _run_range(input_file, start, end, stages, output_file, encoding, chunk_size):
+    """ apply stages to the lines of input_file between byte offsets start and end """
+    with open(input_file, 'rb') as infile, \
+         open(output_file, 'w', encoding=encoding) as outfile:
+        infile.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = infile.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            if remaining > 0 and not data.endswith(b'\n'):
+                tail = infile.readline()
+                data += tail
+                remaining -= len(tail)
+            text = data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+            lines = text.split('\n')
+            if lines[-1] == '':
+                lines.pop()
+            for stage in stages:
+                lines = stage(lines)
+            if lines:
+                outfile.write('\n'.join(lines) + '\n')
+
+def run_pipeline(input_file, output_file, stages, nworkers=1, chunk_size=1 << 22,
+    encoding='utf-8'):
+    """
+    Apply a sequence of stages to the lines of a file in one read, writing
+    each line of the result followed by a newline.
+
+    Args:
+        input_file (str): Path to the input text file.
+        output_file (str): Path to the output text file. May be input_file.
+        stages (list): Stages returned by the *_stage functions, applied in order.
+        nworkers (int): Number of worker processes. With more than one, the file
+                        is split into byte ranges on line boundaries, processed
+                        in parallel, and the results are joined in order.
+        chunk_size (int): Approximate number of bytes read at a time by each worker.
+        encoding (str): Encoding of the input and output files.
+    """
+    tmp_file = output_file + ".tmp"
+    ranges = _line_ranges(input_file, max(1, nworkers))
+    if len(ranges) == 1:
+        _run_range(input_file, *ranges[0], stages, tmp_file, encoding, chunk_size)
+    else:
+        part_files = [f"{tmp_file}{i}" for i in range(len(ranges))]
+        try:
+            with Pool(len(ranges)) as pool:
+                pool.starmap(_run_range, [(input_file, start, end, stages, part_file,
+                                           encoding, chunk_size)
+                                          for (start, end), part_file in zip(ranges, part_files)])
+            with open(tmp_file, 'wb') as outfile:
+                for part_file in part_files:
+                    with open(part_file, 'rb') as f:
+                        shutil.copyfileobj(f, outfile, 1 << 20)
+        finally:
+            for part_file in part_files:
+                if os.path.exists(part_file):
+                    os.remove(part_file)
+    os.replace(tmp_file, output_file)
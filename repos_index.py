@@ -0,0 +1,190 @@
+""" full-text search of the entries of repos.md, with BM25 ranking and prefix
+search. The inverted index is saved to disk and updated incrementally when
+repos.md changes, re-indexing only the entries that were added or edited. """
+import os
+import re
+import json
+import math
+import hashlib
+from bisect import bisect_left
+
+ENTRY_PATTERN = re.compile(r'^\[([^\]]*)\]\(([^)\s]*)\)\s*:?\s*(.*)')
+LINK_PATTERN = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text):
+    """ return the lower case words of text """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def parse_repos_md(markdown_file):
+    """
+    Parse the entries of a markdown catalogue such as repos.md.
+
+    Args:
+        markdown_file (str): Path to the markdown file
+
+    Returns:
+        list of dict: Entries with 'key' (hash of the entry and its section),
+                      'name', 'url', 'section', and 'description'
+    """
+    entries = []
+    section = ""
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#'):
+                section = line.lstrip('#').strip()
+                continue
+            match = ENTRY_PATTERN.match(line)
+            if not match:
+                continue
+            name, url, description = match.groups()
+            key = hashlib.sha1(f"{section}\n{line}".encode('utf-8')).hexdigest()
+            entries.append({'key': key, 'name': name, 'url': url, 'section': section,
+                            'description': description})
+    return entries
+
+def entry_terms(entry):
+    """ return the terms of an entry's name, section heading and description,
+    with the text but not the targets of markdown links """
+    text = " ".join([entry['name'], entry['section'],
+                     LINK_PATTERN.sub(r'\1', entry['description'])])
+    terms = {}
+    for term in tokenize(text):
+        terms[term] = terms.get(term, 0) + 1
+    return terms
+
+def new_index():
+    """ return an empty index """
+    return {'source_mtime': None, 'source_size': None, 'docs': {}, 'postings': {},
+            'total_length': 0}
+
+def update_index(index, entries):
+    """
+    Bring an index up to date with the current entries of the catalogue,
+    removing the postings of entries that disappeared and adding those of new
+    entries. Unchanged entries are not re-tokenized.
+
+    Args:
+        index (dict): Index returned by new_index or load_index
+        entries (list of dict): Entries returned by parse_repos_md
+
+    Returns:
+        tuple: (number of entries added, number of entries removed)
+    """
+    docs = index['docs']
+    postings = index['postings']
+    current = {entry['key']: entry for entry in entries}
+    removed = [key for key in docs if key not in current]
+    for key in removed:
+        doc = docs.pop(key)
+        for term in doc['terms']:
+            plist = postings[term]
+            del plist[key]
+            if not plist:
+                del postings[term]
+        index['total_length'] -= doc['length']
+    added = [key for key in current if key not in docs]
+    for key in added:
+        entry = current[key]
+        terms = entry_terms(entry)
+        for term, tf in terms.items():
+            postings.setdefault(term, {})[key] = tf
+        length = sum(terms.values())
+        docs[key] = {'name': entry['name'], 'url': entry['url'],
+                     'section': entry['section'], 'description': entry['description'],
+                     'terms': list(terms), 'length': length}
+        index['total_length'] += length
+    if removed or added:
+        index.pop('sorted_terms', None)
+    return len(added), len(removed)
+
+def save_index(index, index_file):
+    """ write an index to a JSON file, replacing it only once the write is complete """
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({key: value for key, value in index.items() if key != 'sorted_terms'}, f)
+    os.replace(tmp_file, index_file)
+
+def load_index(index_file, markdown_file="repos.md"):
+    """
+    Load an index from disk, updating and re-saving it if markdown_file has
+    changed since it was built. The index is built from scratch if index_file
+    is missing or unreadable.
+
+    Args:
+        index_file (str): Path to the saved index
+        markdown_file (str): Path to the markdown catalogue
+
+    Returns:
+        dict: The index
+    """
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        index = new_index()
+    stat = os.stat(markdown_file)
+    if (index['source_mtime'], index['source_size']) != (stat.st_mtime, stat.st_size):
+        nadded, nremoved = update_index(index, parse_repos_md(markdown_file))
+        index['source_mtime'], index['source_size'] = stat.st_mtime, stat.st_size
+        save_index(index, index_file)
+        print(f"updated {index_file}: {nadded} entries added, {nremoved} removed")
+    return index
+
+def expand_term(index, term):
+    """
+    Return the index terms matching a query term. A term ending in '*' matches
+    all terms with that prefix.
+    """
+    if not term.endswith('*'):
+        return [term] if term in index['postings'] else []
+    prefix = term[:-1]
+    if 'sorted_terms' not in index:
+        index['sorted_terms'] = sorted(index['postings'])
+    terms = index['sorted_terms']
+    matches = []
+    for i in range(bisect_left(terms, prefix), len(terms)):
+        if not terms[i].startswith(prefix):
+            break
+        matches.append(terms[i])
+    return matches
+
+def search(index, query, n=10, k1=1.2, b=0.75):
+    """
+    Rank catalogue entries against a query with BM25.
+
+    Args:
+        index (dict): Index returned by load_index
+        query (str): Words to search for. A word ending in '*' is a prefix,
+                     e.g. "finite elem*"
+        n (int): Maximum number of results
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalization
+
+    Returns:
+        list of tuple: (score, entry dict) in descending order of score
+    """
+    docs = index['docs']
+    postings = index['postings']
+    ndocs = len(docs)
+    if ndocs == 0:
+        return []
+    avg_length = index['total_length'] / ndocs
+    scores = {}
+    for word in query.split():
+        parts = tokenize(word)
+        if word.endswith('*') and parts:
+            parts[-1] += '*'
+        for part in parts:
+            for term in expand_term(index, part):
+                _add_scores(scores, postings[term], docs, ndocs, avg_length, k1, b)
+    ranked = sorted(scores.items(), key=lambda x: (-x[1], docs[x[0]]['name'].lower()))
+    return [(score, docs[key]) for key, score in ranked[:n]]
+
+def _add_scores(scores, plist, docs, ndocs, avg_length, k1, b):
+    """ add the BM25 contribution of one term, with posting list plist, to scores """
+    idf = math.log(1 + (ndocs - len(plist) + 0.5) / (len(plist) + 0.5))
+    for key, tf in plist.items():
+        norm = k1 * (1 - b + b * docs[key]['length'] / avg_length)
+        scores[key] = scores.get(key, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
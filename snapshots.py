@@ -0,0 +1,157 @@
+""" content-addressed snapshots of data files. Each file is stored once per
+distinct content under objects/, named by its SHA-256 hash, so a snapshot only
+copies the files that changed since the files already archived. Snapshot n is
+described by snapshots/<n>.json, mapping file paths to hashes, and the file
+"latest" holds the number of the newest snapshot, so finding the latest or the
+nth snapshot takes one file read however many snapshots there are. """
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def file_hash(file_path, block_size=1 << 20):
+    """ return the SHA-256 hex digest of a file's contents """
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _object_path(archive_dir, digest):
+    return os.path.join(archive_dir, "objects", digest[:2], digest)
+
+def _write_json(file_path, data):
+    tmp_file = file_path + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp_file, file_path)
+
+def _read_json(file_path, default):
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def _store(archive_dir, file_path, stat_cache):
+    """ hash a file, reusing the cached hash if its size and mtime are unchanged,
+    and copy it into the archive if its content is new. Returns the stat cache
+    key, the new cache entry [size, mtime_ns, hash], and whether the file was copied. """
+    st = os.stat(file_path)
+    key = os.path.abspath(file_path)
+    cached = stat_cache.get(key)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        digest = cached[2]
+    else:
+        digest = file_hash(file_path)
+    object_path = _object_path(archive_dir, digest)
+    copied = False
+    if not os.path.exists(object_path):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_file = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(file_path, tmp_file)  # uses sendfile/fcopyfile where available
+        os.replace(tmp_file, object_path)
+        copied = True
+    return key, [st.st_size, st.st_mtime_ns, digest], copied
+
+def latest_snapshot(archive_dir):
+    """ return the number of the newest snapshot, or 0 if there are none """
+    try:
+        with open(os.path.join(archive_dir, "latest"), 'r') as f:
+            return int(f.read())
+    except FileNotFoundError:
+        return 0
+
+def read_snapshot(archive_dir, n=None):
+    """
+    Read the manifest of a snapshot.
+
+    Args:
+        archive_dir (str): Path to the archive
+        n (int, optional): Snapshot number, counting from 1. Negative values
+                           count back from the newest, -1 being the newest.
+                           Defaults to the newest.
+
+    Returns:
+        dict: Manifest with 'number', 'time', and 'files' mapping paths to hashes
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist
+    """
+    latest = latest_snapshot(archive_dir)
+    if n is None:
+        n = latest
+    elif n < 0:
+        n = latest + 1 + n
+    manifest = _read_json(os.path.join(archive_dir, "snapshots", f"{n}.json"), None)
+    if manifest is None:
+        raise FileNotFoundError(f"no snapshot {n} in '{archive_dir}'")
+    return manifest
+
+def save_snapshot(archive_dir, paths, nworkers=8):
+    """
+    Archive a set of files and directories as a new snapshot. Directories are
+    archived recursively, keeping their tree structure. Files are hashed and
+    copied in parallel threads, and only files whose content is not already
+    archived are copied.
+
+    Args:
+        archive_dir (str): Path to the archive, created if needed
+        paths (list of str): Files and directories to archive
+        nworkers (int): Number of threads hashing and copying files
+
+    Returns:
+        tuple: (snapshot number, number of files, number of files copied)
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names))
+        else:
+            files.append(path)
+    os.makedirs(os.path.join(archive_dir, "snapshots"), exist_ok=True)
+    cache_file = os.path.join(archive_dir, "stat_cache.json")
+    stat_cache = _read_json(cache_file, {})
+    with ThreadPoolExecutor(nworkers) as pool:
+        results = list(pool.map(lambda f: _store(archive_dir, f, stat_cache), files))
+    for key, entry, copied in results:
+        stat_cache[key] = entry
+    _write_json(cache_file, stat_cache)
+    n = latest_snapshot(archive_dir) + 1
+    manifest = {'number': n, 'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'files': {os.path.normpath(f).replace(os.sep, '/'): entry[2]
+                          for f, (key, entry, copied) in zip(files, results)}}
+    _write_json(os.path.join(archive_dir, "snapshots", f"{n}.json"), manifest)
+    latest_file = os.path.join(archive_dir, "latest")
+    with open(latest_file + ".tmp", 'w') as f:
+        f.write(str(n))
+    os.replace(latest_file + ".tmp", latest_file)
+    return n, len(files), sum(copied for key, entry, copied in results)
+
+def restore_snapshot(archive_dir, dest_dir, n=None, nworkers=8):
+    """
+    Copy the files of a snapshot into dest_dir, recreating their directory tree.
+
+    Args:
+        archive_dir (str): Path to the archive
+        dest_dir (str): Directory to restore into
+        n (int, optional): Snapshot number, as for read_snapshot. Defaults to the newest.
+        nworkers (int): Number of threads copying files
+
+    Returns:
+        list of str: Paths of the restored files
+    """
+    manifest = read_snapshot(archive_dir, n)
+    def restore(item):
+        name, digest = item
+        target = os.path.join(dest_dir, *name.lstrip('/').split('/'))
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        shutil.copyfile(_object_path(archive_dir, digest), target)
+        return target
+    with ThreadPoolExecutor(nworkers) as pool:
+        return list(pool.map(restore, manifest['files'].items()))
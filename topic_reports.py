@@ -0,0 +1,120 @@
+""" write the topic_* report files from repo data in one pass """
+import os
+from github_util import read_repo_data, topics_to_repos
+from util import sort_dict_by_value_length
+
+BUFFER_SIZE = 1 << 16  # bytes buffered by each report writer
+
+def is_stale(output_file, input_files):
+    """
+    Check whether a report must be regenerated, in the manner of make.
+
+    Args:
+        output_file (str): Path to the report file
+        input_files (list of str): Paths to the files the report depends on
+
+    Returns:
+        bool: True if output_file is missing or older than any existing input file
+    """
+    if not os.path.exists(output_file):
+        return True
+    out_mtime = os.path.getmtime(output_file)
+    return any(os.path.getmtime(f) > out_mtime for f in input_files
+               if os.path.exists(f))
+
+def write_report(output_file, lines):
+    """
+    Write an iterable of lines (without newlines) to a file through a buffered
+    writer. The report is written to a temporary file that replaces output_file
+    only once it is complete, so an interrupted run never leaves a partial report.
+
+    Args:
+        output_file (str): Path to the report file
+        lines (iterable of str): Lines of the report
+    """
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+        f.writelines(line + '\n' for line in lines)
+    os.replace(tmp_file, output_file)
+
+def topic_count_lines(dtopics, max_repos_print=None, final_blank=True):
+    """
+    Yield lines listing each topic with its number of repos, in the format of
+    xread_repo_data.py.
+
+    Args:
+        dtopics (dict): Topics mapped to lists of repo URLs, sorted by
+                        sort_dict_by_value_length
+        max_repos_print (int, optional): If not None, list the repo URLs of
+                        topics with at most this many repos, followed by a blank line
+        final_blank (bool): If False, omit the blank line after the repos of
+                        the last topic
+
+    Yields:
+        str: Report lines
+    """
+    blank = False
+    for topic, urls in dtopics.items():
+        if blank:
+            yield ""
+        yield "%5d %s" % (len(urls), topic)
+        blank = max_repos_print is not None and len(urls) <= max_repos_print
+        if blank:
+            yield from urls
+    if blank and final_blank:
+        yield ""
+
+def topics_by_stars_lines(dtopics, repo_dict):
+    """
+    Yield lines listing the repos of each topic in descending order of stars,
+    with their license and other topics, in the format of xsort_by_stars.py.
+
+    Args:
+        dtopics (dict): Topics mapped to lists of repo URLs
+        repo_dict (dict): Repo URLs mapped to dicts with 'stars', 'license', 'topics'
+
+    Yields:
+        str: Report lines
+    """
+    for topic, urls in dtopics.items():
+        yield ""
+        yield f"Topic: {topic}"
+        yield "-" * 50
+        repos = [url for url in urls if url in repo_dict]
+        if not repos:
+            yield "No matching repository data found."
+            continue
+        repos.sort(key=lambda url: repo_dict[url].get('stars', 0), reverse=True)
+        for url in repos:
+            data = repo_dict[url]
+            additional_topics = [t for t in data.get('topics', []) if t != topic]
+            additional = ", ".join(additional_topics) if additional_topics else "None"
+            yield (f"{data.get('stars', 0)} {url} - License: {data.get('license')}"
+                   f" - Additional Topics: {additional}")
+
+def write_topic_reports(infile, reports, depends=(), force=False):
+    """
+    Regenerate the stale topic reports for a repo data file. The data file is
+    parsed and the topic index is built at most once, and only if some report
+    is stale.
+
+    Args:
+        infile (str): Repo data file written by xrepo_data.py
+        reports (dict): Report file names mapped to functions taking
+                        (dtopics, repo_dict) and returning an iterable of lines
+        depends (sequence of str): Other files the reports depend on, such as
+                        the script that defines them. This module is always included.
+        force (bool): If True, regenerate all reports
+
+    Returns:
+        list of str: Names of the report files that were written
+    """
+    inputs = [infile, __file__] + list(depends)
+    stale = [f for f in reports if force or is_stale(f, inputs)]
+    if not stale:
+        return []
+    repo_dict = read_repo_data(infile)
+    dtopics = sort_dict_by_value_length(topics_to_repos(repo_dict))
+    for output_file in stale:
+        write_report(output_file, reports[output_file](dtopics, repo_dict))
+    return stale
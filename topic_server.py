@@ -0,0 +1,172 @@
+""" serve topic and star queries on repo data held in memory, reloading
+the data when the file written by xrepo_data.py changes """
+import os
+import json
+import time
+import threading
+from itertools import islice
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from github_util import read_repo_data, topics_to_repos
+from util import sort_dict_by_value_length
+
+def build_index(infile):
+    """
+    Read a repo data file and build the lookup tables used to answer queries.
+
+    Args:
+        infile (str): Repo data file written by xrepo_data.py
+
+    Returns:
+        dict: Dictionary with 'repos' (repo URLs mapped to their data),
+              'topics' (topics mapped to repo URLs in descending order of stars,
+              with topics sorted by number of repos), 'ranked' (all repo URLs in
+              descending order of stars), and 'mtime' of infile
+    """
+    mtime = os.path.getmtime(infile)
+    repo_dict = read_repo_data(infile)
+    dtopics = sort_dict_by_value_length(topics_to_repos(repo_dict))
+    stars = lambda url: repo_dict[url].get('stars', 0)
+    for urls in dtopics.values():
+        urls.sort(key=stars, reverse=True)
+    ranked = sorted(repo_dict, key=stars, reverse=True)
+    return {'repos': repo_dict, 'topics': dtopics, 'ranked': ranked, 'mtime': mtime}
+
+def latency_stats(latencies):
+    """
+    Summarize query latencies.
+
+    Args:
+        latencies (sequence of float): Query latencies in seconds
+
+    Returns:
+        dict: 'count', and 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms' in milliseconds
+              (omitted if there are no latencies)
+    """
+    n = len(latencies)
+    if n == 0:
+        return {'count': 0}
+    xs = sorted(latencies)
+    return {'count': n,
+            'mean_ms': 1000 * sum(xs) / n,
+            'p50_ms': 1000 * xs[(n - 1) // 2],
+            'p99_ms': 1000 * xs[min(n - 1, int(0.99 * n))],
+            'max_ms': 1000 * xs[-1]}
+
+def query(index, path, params):
+    """
+    Answer a query against an index built by build_index.
+
+    Args:
+        index (dict): Index returned by build_index
+        path (str): Query name: '/topic', '/top', '/repo', or '/topics'
+        params (dict): Query parameters mapped to single values
+
+    Returns:
+        tuple: (HTTP status code, JSON-serializable result)
+
+    Queries:
+        /topic?name=X         repos with topic X, in descending order of stars
+        /top?topic=X&n=10     the n most starred repos with topic X (all repos if topic omitted)
+        /repo?url=U           stars, license and topics of repo U
+        /topics?n=10          the n topics with the most repos, with their counts
+    """
+    repos = index['repos']
+    topics = index['topics']
+    try:
+        n = int(params.get('n', 10))
+    except ValueError:
+        return 400, {'error': "n must be an integer"}
+    if n < 0:
+        return 400, {'error': "n must be non-negative"}
+    if path == '/topic':
+        name = params.get('name')
+        if name not in topics:
+            return 404, {'error': f"unknown topic: {name}"}
+        return 200, [{'url': url, **repos[url]} for url in topics[name]]
+    elif path == '/top':
+        topic = params.get('topic')
+        if topic is None:
+            urls = index['ranked']
+        elif topic in topics:
+            urls = topics[topic]
+        else:
+            return 404, {'error': f"unknown topic: {topic}"}
+        return 200, [{'url': url, **repos[url]} for url in urls[:n]]
+    elif path == '/repo':
+        url = params.get('url')
+        if url not in repos:
+            return 404, {'error': f"unknown repo: {url}"}
+        return 200, {'url': url, **repos[url]}
+    elif path == '/topics':
+        return 200, [[topic, len(urls)] for topic, urls in islice(topics.items(), n)]
+    return 404, {'error': f"unknown query: {path}"}
+
+class TopicServer(ThreadingHTTPServer):
+    """
+    HTTP server holding the index of a repo data file in memory. A background
+    thread polls the file every poll_interval seconds and swaps in a new index
+    when it changes, so queries are never blocked by a reload. A new index with
+    fewer than min_reload_fraction of the current number of repos, such as one
+    read from a file caught mid-write, is not swapped in; the file is read
+    again once its mtime changes.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, infile, poll_interval=1.0, max_latencies=10000,
+        min_reload_fraction=0.5):
+        super().__init__(address, TopicRequestHandler)
+        self.infile = infile
+        self.poll_interval = poll_interval
+        self.min_reload_fraction = min_reload_fraction
+        self.rejected_mtime = None
+        self.index = build_index(infile)
+        self.latencies = deque(maxlen=max_latencies)
+        self.nreloads = 0
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                mtime = os.path.getmtime(self.infile)
+                if mtime not in (self.index['mtime'], self.rejected_mtime):
+                    index = build_index(self.infile)
+                    nold, nnew = len(self.index['repos']), len(index['repos'])
+                    if nnew == 0 or nnew < self.min_reload_fraction * nold:
+                        self.rejected_mtime = index['mtime']
+                        print(f"not reloading {self.infile}: {nnew} repos, was {nold}")
+                        continue
+                    self.index = index
+                    self.nreloads += 1
+                    print(f"reloaded {self.infile}: {nnew} repos")
+            except OSError as e:
+                print(f"Error reloading '{self.infile}': {e}")
+
+class TopicRequestHandler(BaseHTTPRequestHandler):
+    """ answer GET requests with JSON, recording the time taken by each query,
+    from parsing the request to writing the response """
+
+    def do_GET(self):
+        t0 = time.perf_counter()
+        parts = urlsplit(self.path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if parts.path == '/stats':
+            status, result = 200, {'latency': latency_stats(list(self.server.latencies)),
+                                   'repos': len(self.server.index['repos']),
+                                   'topics': len(self.server.index['topics']),
+                                   'reloads': self.server.nreloads}
+        else:
+            status, result = query(self.server.index, parts.path, params)
+        body = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if parts.path != '/stats':
+            self.server.latencies.append(time.perf_counter() - t0)
+
+    def log_message(self, format, *args):
+        pass  # per-request logging would dominate query time
@@ -239,13 +239,132 @@ def index(xlist, value):
     else:
         return -1
 
-def replace_strings_in_file(filename, replacements):
+def replacements_pattern(replacements):
+    """
+    Compile the keys of a replacement dictionary into one regular expression
+    that finds, at the leftmost position, the longest key that matches there.
+    The keys are arranged as a trie, so keys with a common prefix share their
+    comparisons, as in the Aho-Corasick algorithm. Empty keys are ignored.
+
+    Args:
+        replacements (dict): Dictionary with keys as strings to find
+
+    Returns:
+        re.Pattern: Compiled pattern, or None if there are no non-empty keys
+    """
+    trie = {}
+    for key in replacements:
+        if key:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = True
+    if not trie:
+        return None
+    # Emit the regex without recursion. Runs of trie nodes with one child and
+    # no key ending there become one literal, so group nesting grows with the
+    # number of branch points rather than the length of the keys. Greedy
+    # optional groups try longer keys before the key ending at a node.
+    pieces = []
+    stack = [trie]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            pieces.append(item)
+            continue
+        children = sorted((char, child) for char, child in item.items() if char)
+        if not children:
+            continue
+        optional = '' in item
+        grouped = optional or len(children) > 1
+        parts = ['(?:'] if grouped else []
+        for i, (char, child) in enumerate(children):
+            if i:
+                parts.append('|')
+            literal = [char]
+            while len(child) == 1 and '' not in child:
+                (char, child), = child.items()
+                literal.append(char)
+            parts.append(re.escape(''.join(literal)))
+            parts.append(child)
+        if grouped:
+            parts.append(')?' if optional else ')')
+        stack.extend(reversed(parts))
+    return re.compile(''.join(pieces))
+
+def replace_strings(text, replacements, pattern=None):
+    """
+    Replace the keys of a dictionary by their values in a single pass over text.
+    Where keys overlap, the one starting first wins, and of those the longest,
+    so the result does not depend on the order of the dictionary, and replaced
+    text is not itself searched for keys.
+
+    Args:
+        text (str): Text to modify
+        replacements (dict): Dictionary with keys as strings to find and values as replacements
+        pattern (re.Pattern, optional): Result of replacements_pattern(replacements),
+                                        to avoid recompiling it
+
+    Returns:
+        str: The modified text
+    """
+    if pattern is None:
+        pattern = replacements_pattern(replacements)
+    if pattern is None:
+        return text
+    return pattern.sub(lambda m: replacements[m.group(0)], text)
+
+def replace_strings_in_stream(infile, outfile, replacements, chunk_size=1 << 20):
+    """
+    Copy a text stream, replacing the keys of a dictionary by their values with
+    the semantics of replace_strings, reading chunk_size characters at a time
+    so that files larger than memory can be processed.
+
+    Args:
+        infile (file): Input text stream
+        outfile (file): Output text stream
+        replacements (dict): Dictionary with keys as strings to find and values as replacements
+        chunk_size (int): Number of characters read at a time
+    """
+    pattern = replacements_pattern(replacements)
+    if pattern is None:
+        for chunk in iter(lambda: infile.read(chunk_size), ''):
+            outfile.write(chunk)
+        return
+    max_len = max(len(key) for key in replacements)
+    carry = ''
+    while True:
+        chunk = infile.read(chunk_size)
+        buffer = carry + chunk
+        # a match starting before safe ends inside buffer, so it is final
+        safe = len(buffer) if not chunk else len(buffer) - max_len + 1
+        pos = 0
+        pieces = []
+        for m in pattern.finditer(buffer):
+            if m.start() >= safe:
+                break
+            pieces.append(buffer[pos:m.start()])
+            pieces.append(replacements[m.group(0)])
+            pos = m.end()
+        keep = max(pos, safe)
+        pieces.append(buffer[pos:keep])
+        outfile.write(''.join(pieces))
+        carry = buffer[keep:]
+        if not chunk:
+            break
+
+def replace_strings_in_file(filename, replacements, single_pass=False, chunk_size=1 << 20):
     """
     Reads a file, performs string replacements from a dictionary, and writes to stdout.
     
     Args:
         filename (str): Path to the input file
         replacements (dict): Dictionary with keys as strings to find and values as replacements
+        single_pass (bool, optional): If True, replace all keys in one streaming pass
+            with replace_strings_in_stream, so that overlapping keys resolve
+            leftmost-longest and the file need not fit in memory. If False, apply
+            one str.replace per key, in dictionary order. Defaults to False.
+        chunk_size (int, optional): Characters read at a time when single_pass is True
     
     Returns:
         None: Outputs directly to stdout
@@ -255,6 +374,11 @@ def replace_strings_in_file(filename, replacements):
         IOError: If there's an error reading the file
     """
     try:
+        if single_pass:
+            with open(filename, 'r') as file:
+                replace_strings_in_stream(file, sys.stdout, replacements, chunk_size)
+            return
+
         # Open and read the file
         with open(filename, 'r') as file:
             content = file.read()
@@ -0,0 +1,53 @@
+""" time a chain of util.py file transforms, each making its own pass through
+intermediate files, against line_pipeline.run_pipeline with one and several
+worker processes, on a generated file of size_gb gigabytes """
+import os
+import sys
+import time
+import filecmp
+import tempfile
+from multiprocessing import cpu_count
+import util
+from line_pipeline import (run_pipeline, csv_to_lines_stage, expand_ranges_stage,
+    truncate_stage, modify_lines_stage)
+
+size_gb = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+nworkers = cpu_count()
+sample_lines = ["alpha, beta (note), gamma", "07–12", "   subroutine foo(x)",
+                "end subroutine foo", "program main ! comment", "x = 1, y = 2"]
+prefixes = ["subroutine", "end", "program"] + [f"keyword{i}" for i in range(100)]
+
+def timed(label, func):
+    t0 = time.perf_counter()
+    func()
+    print("%-30s %8.2f s" % (label, time.perf_counter() - t0))
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        infile = os.path.join(tmp_dir, "input.txt")
+        block = ("\n".join(sample_lines) + "\n") * 10000
+        with open(infile, "w", encoding="utf-8") as f:
+            for _ in range(max(1, int(size_gb * 1e9 / len(block.encode("utf-8"))))):
+                f.write(block)
+        print("input %.2f GB, %d workers" % (os.path.getsize(infile) / 1e9, nworkers))
+        step = [os.path.join(tmp_dir, f"step{i}.txt") for i in range(3)]
+
+        def legacy():
+            util.process_csv_to_lines(infile, step[0])
+            util.expand_ranges(step[0], step[1])
+            util.truncate_lines_at_sentinel(step[1], step[2], "(")
+            # modify_lines works on a string, so the whole file is read into memory
+            with open(step[2], "r", encoding="utf-8") as f:
+                text = util.modify_lines(f.read(), prefixes, ";", ignore_spaces=True)
+            with open(step[2], "w", encoding="utf-8") as f:
+                f.write(text)
+
+        stages = [csv_to_lines_stage(), expand_ranges_stage(), truncate_stage("("),
+                  modify_lines_stage(prefixes, ";", ignore_spaces=True)]
+        timed("util.py functions", legacy)
+        timed("run_pipeline, 1 worker",
+              lambda: run_pipeline(infile, step[0], stages))
+        timed(f"run_pipeline, {nworkers} workers",
+              lambda: run_pipeline(infile, step[1], stages, nworkers=nworkers))
+        print("outputs identical:", filecmp.cmp(step[2], step[0], shallow=False)
+              and filecmp.cmp(step[2], step[1], shallow=False))
@@ -0,0 +1,23 @@
+""" time util.replace_strings_in_file with one str.replace per key against the
+single-pass replacer, rewriting the GitHub URLs of repos.md """
+import os
+import time
+from contextlib import redirect_stdout
+from util import replace_strings_in_file
+
+infile = "repos.md"
+urls_file = "github_fortran_urls.txt"
+max_keys = [10, 100, 1000, None] # numbers of replacements to time, None for all
+with open(urls_file, "r") as f:
+    urls = [line.strip() for line in f if line.strip()]
+print("%8s %12s %12s" % ("keys", "str.replace", "single pass"))
+for nkeys in max_keys:
+    replacements = {url: url.replace("https://github.com/", "https://example.org/")
+                    for url in urls[:nkeys]}
+    times = []
+    for single_pass in [False, True]:
+        t0 = time.perf_counter()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            replace_strings_in_file(infile, replacements, single_pass=single_pass)
+        times.append(time.perf_counter() - t0)
+    print("%8d %11.3fs %11.3fs" % (len(replacements), *times))
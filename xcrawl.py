@@ -0,0 +1,44 @@
+""" crawl a set of GitHub URLs with several worker processes sharing a work
+queue, then write the repo data in the format of xrepo_data.py.
+Run "python xcrawl.py --worker" on other machines that can reach queue_db
+to add their workers to the crawl. queue_db is kept between runs so that an
+interrupted crawl resumes; run "python xcrawl.py --new" to crawl all URLs again. """
+import sys
+import time
+from multiprocessing import Process
+from crawl_queue import (add_urls, reset_queue, run_worker, queue_status,
+    worker_throughput, write_repo_data)
+
+infile = "github_fortran_urls.txt"
+outfile = "fortran_repo_data.txt"
+queue_db = "crawl_queue.db"
+nworkers = 4 # local worker processes
+batch_size = 20 # URLs claimed by a worker at a time
+lease_seconds = 300.0 # time a worker has to return a batch before it is re-queued
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv[1:]:
+        print("completed", run_worker(queue_db, batch_size=batch_size,
+                                      lease_seconds=lease_seconds))
+        sys.exit()
+    with open(infile, "r") as f:
+        urls = [line.strip() for line in f if line.strip()]
+    if "--new" in sys.argv[1:]:
+        print("reset", reset_queue(queue_db), "URLs in", queue_db)
+    print("added", add_urls(queue_db, urls), "URLs to", queue_db)
+    t0 = time.time()
+    workers = [Process(target=run_worker, args=(queue_db, f"local-{i}", batch_size,
+                                                 lease_seconds)) for i in range(nworkers)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    status = queue_status(queue_db)
+    print("status", status, "in %.1f s" % (time.time() - t0))
+    for worker, nrepos, seconds, rate in worker_throughput(queue_db):
+        print("%-30s %6d repos %9.1f s %8.2f repos/s" % (worker, nrepos, seconds, rate))
+    if status["pending"] or status["leased"]:
+        print(f"not writing {outfile}: {status['pending'] + status['leased']} URLs"
+              " are not done; rerun xcrawl.py to finish the crawl")
+        sys.exit(1)
+    print("wrote", write_repo_data(queue_db, outfile), "repos to", outfile)
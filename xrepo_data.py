@@ -1,12 +1,16 @@
 """ for a set of GitHub URLs, scrape data for the repos and print it """
-from github_util import repo_data
+from github_util import repo_data, load_repo_memo, save_repo_memo
 
 max_repos = None
 infile = "github_fortran_urls.txt"
 lines = open(infile, "r").readlines()[:max_repos]
-for line in lines:
-    repo_url = line.strip()
-    print("\n" + repo_url)
-    dd = repo_data(repo_url)
-    for key, value in dd.items():
-        print(key, value)
+memo = load_repo_memo() # renamed and deleted repos seen in earlier crawls
+try:
+    for line in lines:
+        repo_url = line.strip()
+        print("\n" + repo_url)
+        dd = repo_data(repo_url, memo=memo)
+        for key, value in dd.items():
+            print(key, value)
+finally:
+    save_repo_memo(memo) # keep what was learned even if the crawl is interrupted
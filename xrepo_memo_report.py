@@ -0,0 +1,13 @@
+""" list the URLs of github_fortran_urls.txt that should be updated, because
+the repo was renamed or was not found, according to the memo written by xrepo_data.py """
+from github_util import load_repo_memo, memo_report
+
+urls_file = "github_fortran_urls.txt"
+memo = load_repo_memo()
+report = memo_report(memo, urls_file)
+for url, status, target in report:
+    if status == "redirect":
+        print(url, "->", target)
+    else:
+        print(url, "not found")
+print(len(report), "of", len(memo), "memo entries are in", urls_file)
@@ -0,0 +1,18 @@
+""" search the entries of repos.md, for example
+    python xsearch_repos.py finite elem*
+The index is saved in repos_index.json and updated when repos.md changes. """
+import sys
+import time
+from repos_index import load_index, search
+
+markdown_file = "repos.md"
+index_file = "repos_index.json"
+max_results = 20
+query = " ".join(sys.argv[1:])
+index = load_index(index_file, markdown_file)
+t0 = time.perf_counter()
+results = search(index, query, n=max_results)
+print(f"{len(results)} results for '{query}' in {1000 * (time.perf_counter() - t0):.2f} ms")
+for score, entry in results:
+    print(f"\n{score:6.2f} [{entry['section']}] {entry['name']} {entry['url']}")
+    print(entry['description'])
@@ -0,0 +1,28 @@
+""" save a snapshot of the data files after a crawl, storing only files whose
+content changed since earlier snapshots. With --list, print the newest snapshots
+instead. With --restore N DIR, copy the files of snapshot N into DIR. """
+import sys
+from snapshots import save_snapshot, read_snapshot, latest_snapshot, restore_snapshot
+
+archive_dir = "snapshots"
+data_files = ["fortran_repo_data.txt", "github_fortran_urls.txt", "repos.md",
+              "topics_by_stars.txt", "topic_lists.txt", "topic_counts.txt",
+              "topic_counts_and_repos.txt"]
+max_list = 10 # snapshots printed by --list
+usage = "usage: python xsnapshot.py [--list | --restore N DIR]"
+
+args = sys.argv[1:]
+if not args:
+    n, nfiles, ncopied = save_snapshot(archive_dir, data_files)
+    print(f"snapshot {n}: {nfiles} files, {ncopied} copied")
+elif args == ["--list"]:
+    latest = latest_snapshot(archive_dir)
+    for n in range(latest, max(0, latest - max_list), -1):
+        manifest = read_snapshot(archive_dir, n)
+        print("%5d %s %d files" % (n, manifest["time"], len(manifest["files"])))
+elif args[:1] == ["--restore"] and len(args) == 3 and args[1].lstrip("-").isdigit():
+    files = restore_snapshot(archive_dir, args[2], int(args[1]))
+    print("restored", len(files), "files to", args[2])
+else:
+    print(usage, file=sys.stderr)
+    sys.exit(2)
@@ -0,0 +1,19 @@
+""" regenerate topic_counts.txt, topic_counts_and_repos.txt, topic_lists.txt
+and topics_by_stars.txt from repo data obtained by running xrepo_data.py,
+parsing the data once and skipping reports that are up to date """
+import sys
+from topic_reports import write_topic_reports, topic_count_lines, topics_by_stars_lines
+
+infile = "fortran_repo_data.txt" # output of xrepo_data.py
+max_repos_print = 100 # list repos of topics with at most this many repos in topic_counts_and_repos.txt
+force = "--force" in sys.argv[1:]
+reports = {
+    "topic_counts.txt": lambda dtopics, dd: topic_count_lines(dtopics),
+    "topic_counts_and_repos.txt": lambda dtopics, dd: topic_count_lines(dtopics, max_repos_print,
+                                                                        final_blank=False),
+    "topic_lists.txt": lambda dtopics, dd: topic_count_lines(dtopics, max_repos_print=sys.maxsize),
+    "topics_by_stars.txt": topics_by_stars_lines,
+}
+written = write_topic_reports(infile, reports, depends=[__file__], force=force)
+for output_file in reports:
+    print(("wrote " if output_file in written else "up to date ") + output_file)
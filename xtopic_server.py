@@ -0,0 +1,16 @@
+""" run a local server answering topic and star queries on repo data obtained
+by running xrepo_data.py, for example
+    curl "http://127.0.0.1:8765/top?topic=cfd&n=5"
+    curl "http://127.0.0.1:8765/stats" """
+from topic_server import TopicServer
+
+infile = "fortran_repo_data.txt" # output of xrepo_data.py
+host = "127.0.0.1"
+port = 8765
+poll_interval = 1.0 # seconds between checks for a changed infile
+server = TopicServer((host, port), infile, poll_interval=poll_interval)
+print(f"serving {len(server.index['repos'])} repos from {infile} at http://{host}:{port}")
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    server.server_close()